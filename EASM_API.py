@@ -1,10 +1,16 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib.parse
 from datetime import datetime
 import time
 import pandas as pd
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 
 # Define color mappings for statuses
 STATUS_COLORS = {
@@ -19,7 +25,92 @@ STATUS_COLORS = {
     "statusretrievalfailed": "#FECACA"
 }
 
-def get_auth_token(username, password, gateway_url):
+# Profile fields shown in the table and their defaults when missing from the API response
+PROFILE_FIELDS = {
+    "profileName": "N/A",
+    "status": "Unknown",
+    "lastConfiguredOn": "N/A",
+    "nextScheduledSyncOn": "N/A",
+    "lastDiscoveryCompletedOn": "N/A"
+}
+
+# Seconds between profile status refreshes
+REFRESH_SECONDS = 30
+
+# Cached profiles expire a little before the next refresh tick, so a tick that
+# fires slightly early after the previous fetch still gets fresh data
+PROFILES_TTL_SECONDS = REFRESH_SECONDS - 5
+
+# (connect, read) timeout in seconds for API requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Status validators unused for this long are evicted, and at most this many are
+# kept, so bearer tokens from old logins are not retained by the server process
+VALIDATORS_TTL_SECONDS = 2 * REFRESH_SECONDS
+MAX_VALIDATORS = 256
+
+# Maximum concurrent API requests; the connection pool is sized to match so
+# every worker keeps its own keep-alive connection to the gateway
+MAX_WORKERS = 32
+
+# Maximum deletes in flight at once, so a bulk delete cannot take over the shared pool
+MAX_DELETE_WORKERS = 8
+
+@st.cache_resource(show_spinner=False)
+def _http_session():
+    """Create the HTTP session shared by every rerun and browser session."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    ))
+    return session
+
+@st.cache_resource(show_spinner=False)
+def _worker_pool():
+    """Create the thread pool used to fan out API calls."""
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+@st.cache_resource(show_spinner=False)
+def _status_validators():
+    """Create the (gateway_url, auth_token) -> (etag, last_modified, profiles, stored_at) map and its lock."""
+    return OrderedDict(), threading.Lock()
+
+# Streamlit re-executes this module on every rerun, so these are cached
+# resources rather than plain globals to keep them alive
+_SESSION = _http_session()
+_EXECUTOR = _worker_pool()
+_STATUS_VALIDATORS, _VALIDATORS_LOCK = _status_validators()
+
+def _get_validators(key):
+    """Return the (etag, last_modified, profiles) stored for key, or None if missing or expired."""
+    with _VALIDATORS_LOCK:
+        entry = _STATUS_VALIDATORS.get(key)
+        if entry is None or time.monotonic() - entry[3] >= VALIDATORS_TTL_SECONDS:
+            _STATUS_VALIDATORS.pop(key, None)
+            return None
+        return entry[:3]
+
+def _store_validators(key, etag, last_modified, profiles):
+    """Store validators for key, evicting expired and least recently stored entries."""
+    now = time.monotonic()
+    with _VALIDATORS_LOCK:
+        _STATUS_VALIDATORS[key] = (etag, last_modified, profiles, now)
+        _STATUS_VALIDATORS.move_to_end(key)
+        # Entries are ordered by store time, so expired ones are at the front
+        while len(_STATUS_VALIDATORS) > MAX_VALIDATORS or \
+                now - next(iter(_STATUS_VALIDATORS.values()))[3] >= VALIDATORS_TTL_SECONDS:
+            _STATUS_VALIDATORS.popitem(last=False)
+
+def drop_validators(auth_tokens):
+    """Forget stored validators for the given auth tokens on any gateway."""
+    auth_tokens = set(auth_tokens)
+    with _VALIDATORS_LOCK:
+        for key in [key for key in _STATUS_VALIDATORS if key[1] in auth_tokens]:
+            del _STATUS_VALIDATORS[key]
+
+def get_auth_token(username, password, gateway_url, session=_SESSION):
     """Authenticate with API and return the auth token."""
     auth_url = f"https://{gateway_url}/auth"
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
@@ -30,7 +121,7 @@ def get_auth_token(username, password, gateway_url):
         "permissions": "true"
     }
     try:
-        response = requests.post(auth_url, headers=headers, data=data)
+        response = session.post(auth_url, headers=headers, data=data, timeout=REQUEST_TIMEOUT)
         if response.status_code == 201:
             token = response.text.strip()
             if token:
@@ -40,31 +131,62 @@ def get_auth_token(username, password, gateway_url):
     except requests.exceptions.RequestException as e:
         return None, str(e)
 
-def get_profile_status(auth_token, gateway_url):
+def get_profile_status(auth_token, gateway_url, session=_SESSION):
     """Retrieve profile status using the auth token."""
     status_url = f"https://{gateway_url}/easm/v2/profile/status"
     headers = {
         "accept": "*/*",
         "Authorization": f"Bearer {auth_token}"
     }
+    
+    # Make the request conditional when a previous response carried validators
+    cache_key = (gateway_url, auth_token)
+    cached = _get_validators(cache_key)
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
     try:
-        response = requests.get(status_url, headers=headers)
+        response = session.get(status_url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached:
+            _store_validators(cache_key, *cached)
+            return cached[2], None
         response.raise_for_status()
-        return response.json(), None
+        profiles = response.json()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            _store_validators(cache_key, etag, last_modified, profiles)
+        return profiles, None
     except requests.exceptions.RequestException as e:
         return None, str(e)
 
-def delete_profile(auth_token, gateway_url, profile_name):
+def delete_profile(auth_token, gateway_url, profile_name, session=_SESSION):
     """Delete a profile using the auth token."""
     delete_url = f"https://{gateway_url}/easm/v2/profile?profileName={urllib.parse.quote(profile_name)}"
     headers = {"Authorization": f"Bearer {auth_token}"}
     try:
-        response = requests.delete(delete_url, headers=headers)
+        response = session.delete(delete_url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return True, None
     except requests.exceptions.RequestException as e:
         return False, str(e)
 
+def map_bounded(func, items, limit):
+    """Yield (item, func(item)) in completion order, running at most limit calls at once on the shared pool."""
+    items = iter(items)
+    pending = {_EXECUTOR.submit(func, item): item for item in islice(items, limit)}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            # Refill the freed slot before handing back the finished result
+            for next_item in islice(items, 1):
+                pending[_EXECUTOR.submit(func, next_item)] = next_item
+            yield item, future.result()
+
 def generate_usernames(base_username, start, end):
     """Generate username variations based on the range."""
     usernames = []
@@ -75,6 +197,160 @@ def generate_usernames(base_username, start, end):
             usernames.append(f"{base_username}{i}")
     return usernames
 
+def editor_key():
+    """Return the widget key of the current profiles editor."""
+    return f"profiles_editor_{st.session_state.get('editor_version', 0)}"
+
+def reset_profiles_editor():
+    """Replace the profiles editor with a fresh one seeded from selected_keys."""
+    # The editor's pending edits are positional, so it is replaced whenever the
+    # selection changes outside the editor or the rendered rows change
+    st.session_state.editor_version = st.session_state.get("editor_version", 0) + 1
+
+def apply_selection_edits(key, row_keys):
+    """Fold checkbox edits from the profiles editor into selected_keys."""
+    for position, changes in st.session_state[key]["edited_rows"].items():
+        if "select" in changes:
+            profile_key = row_keys[int(position)]
+            if changes["select"]:
+                st.session_state.selected_keys.add(profile_key)
+            else:
+                st.session_state.selected_keys.discard(profile_key)
+
+def toggle_select_all(row_keys):
+    """Select or clear all of the given profiles when Select All is toggled."""
+    if st.session_state.select_all:
+        st.session_state.selected_keys.update(row_keys)
+    else:
+        st.session_state.selected_keys.difference_update(row_keys)
+    reset_profiles_editor()
+
+def fetch_profiles(tokens, gateway_url):
+    """Fetch profile status for every authenticated user into a DataFrame."""
+    # Fetch profiles data concurrently for all authenticated users
+    results = list(_EXECUTOR.map(
+        lambda token: get_profile_status(token, gateway_url),
+        tokens.values()
+    ))
+    
+    # Accumulate each column separately and build the DataFrame in one pass
+    columns = {"username": [], **{field: [] for field in PROFILE_FIELDS}}
+    for username, (profiles, error) in zip(tokens, results):
+        if profiles:
+            columns["username"].extend([username] * len(profiles))
+            for field, default in PROFILE_FIELDS.items():
+                columns[field].extend(profile.get(field, default) for profile in profiles)
+        else:
+            columns["username"].append(username)
+            for field in PROFILE_FIELDS:
+                columns[field].append("Status Retrieval Failed" if field == "status" else "N/A")
+
+    # Convert to DataFrame for better handling
+    df = pd.DataFrame(columns, copy=False)
+    
+    # Precompute the status cell styling once per fetch rather than per render
+    status_colors = df["status"].str.lower().str.replace(" ", "", regex=False).map(STATUS_COLORS).fillna("#6B7280")
+    df["_status_css"] = "background-color: " + status_colors + "; color: black;"
+    return df
+
+@st.cache_resource(ttl=PROFILES_TTL_SECONDS, show_spinner=False)
+def _shared_profiles(gateway_url, token_items):
+    """Return the profiles DataFrame shared by all sessions polling the same users."""
+    # The result is shared across sessions, so callers must not modify it in place
+    return fetch_profiles(dict(token_items), gateway_url)
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def render_profiles(gateway_url):
+    """Render the search box and profiles table, refreshing them on their own timer."""
+    # Keyed by gateway and tokens, so reconnecting never reuses another login's table
+    df = _shared_profiles(gateway_url, tuple(st.session_state.tokens.items()))
+    
+    # Search filter, only applied when the form is submitted
+    with st.form("search_form", clear_on_submit=False):
+        search = st.text_input("🔍 Search profiles", placeholder="Filter by username, profile name, or status...")
+        st.form_submit_button("Apply")
+    
+    visible_columns = [col for col in df.columns if not col.startswith("_")]
+    if search:
+        # Scan each column once with vectorized string matching
+        mask = pd.concat(
+            [df[col].astype(str).str.contains(search, case=False, regex=False) for col in visible_columns],
+            axis=1
+        ).any(axis=1)
+        df = df[mask]
+        
+    # Display profiles table with checkboxes
+    if not df.empty:
+        # Selections are tracked by (username, profileName) so they survive
+        # search filtering and refreshes that reorder or reindex the rows
+        selected_keys = st.session_state.setdefault("selected_keys", set())
+        row_keys = pd.MultiIndex.from_frame(df[["username", "profileName"]])
+        if st.session_state.get("editor_rows") != tuple(row_keys):
+            st.session_state.editor_rows = tuple(row_keys)
+            reset_profiles_editor()
+        
+        # Create select all checkbox, applied to the visible rows in one update
+        st.checkbox("Select All", key="select_all", on_change=toggle_select_all, args=(row_keys,))
+        
+        # Render all rows in a single grid with an editable selection column;
+        # checkbox edits are folded into selected_keys by the on_change callback
+        df = df.copy(deep=False)
+        df.insert(0, "select", row_keys.isin(list(selected_keys)))
+        key = editor_key()
+        edited = st.data_editor(
+            df.style.apply(lambda _: df["_status_css"], subset=["status"]),
+            column_config={"select": st.column_config.CheckboxColumn("", default=False)},
+            column_order=["select", *visible_columns],
+            disabled=[col for col in df.columns if col != "select"],
+            hide_index=True,
+            use_container_width=True,
+            key=key,
+            on_change=apply_selection_edits,
+            args=(key, row_keys)
+        )
+        selected_profiles = list(
+            edited.loc[edited["select"], ["username", "profileName"]].itertuples(index=False, name=None)
+        )
+                
+        # Bulk delete button
+        if selected_profiles:
+            if st.button(f"Delete Selected ({len(selected_profiles)} profiles)", type="primary"):
+                delete_success = []
+                delete_failed = []
+                
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                status_text.write(f"Deleting {len(selected_profiles)} profiles...")
+                
+                # Dispatch deletes concurrently, reporting progress as each one completes
+                tokens = st.session_state.tokens
+                deletes = map_bounded(
+                    lambda profile: delete_profile(tokens[profile[0]], gateway_url, profile[1]),
+                    selected_profiles,
+                    MAX_DELETE_WORKERS
+                )
+                for done, ((username, profile_name), (success, error)) in enumerate(deletes):
+                    if success:
+                        delete_success.append(profile_name)
+                        selected_keys.discard((username, profile_name))
+                    else:
+                        delete_failed.append((profile_name, error))
+                        
+                    progress_bar.progress((done + 1) / len(selected_profiles))
+                    
+                reset_profiles_editor()
+                if delete_success:
+                    _shared_profiles.clear()
+                    drop_validators(st.session_state.tokens.values())
+                    st.success(f"Successfully deleted {len(delete_success)} profiles")
+                if delete_failed:
+                    for profile, error in delete_failed:
+                        st.error(f"Failed to delete {profile}: {error}")
+                        
+                time.sleep(2)
+                st.rerun(scope="fragment")
+
 def main():
     st.set_page_config(
         page_title="EASM Profile Manager",
@@ -123,131 +399,30 @@ def main():
             tokens = {}
             
             with st.spinner("Authenticating..."):
-                for username in usernames:
-                    token, error = get_auth_token(username, password, gateway_url)
+                # Authenticate all users concurrently,
+                # then report results from the main thread
+                results = list(_EXECUTOR.map(
+                    lambda username: get_auth_token(username, password, gateway_url),
+                    usernames
+                ))
+                
+                for username, (token, error) in zip(usernames, results):
                     if token:
                         tokens[username] = token
                         st.success(f"✅ {username}: Authenticated")
                     else:
                         st.error(f"❌ {username}: {error}")
                 
+                # The previous login's tokens are no longer used
+                drop_validators(st.session_state.get("tokens", {}).values())
                 st.session_state.tokens = tokens
                 st.rerun()
 
     # Main content
     if 'tokens' in st.session_state and st.session_state.tokens:
-        # Initialize or update profiles data
-        if 'update_counter' not in st.session_state:
-            st.session_state.update_counter = 0
-            
-        # Fetch profiles data
-        all_profiles = []
-        for username, token in st.session_state.tokens.items():
-            profiles, error = get_profile_status(token, gateway_url)
-            if profiles:
-                for profile in profiles:
-                    all_profiles.append({
-                        "username": username,
-                        "profileName": profile.get("profileName", "N/A"),
-                        "status": profile.get("status", "Unknown"),
-                        "lastConfiguredOn": profile.get("lastConfiguredOn", "N/A"),
-                        "nextScheduledSyncOn": profile.get("nextScheduledSyncOn", "N/A"),
-                        "lastDiscoveryCompletedOn": profile.get("lastDiscoveryCompletedOn", "N/A")
-                    })
-            else:
-                all_profiles.append({
-                    "username": username,
-                    "profileName": "N/A",
-                    "status": "Status Retrieval Failed",
-                    "lastConfiguredOn": "N/A",
-                    "nextScheduledSyncOn": "N/A",
-                    "lastDiscoveryCompletedOn": "N/A"
-                })
-
-        # Convert to DataFrame for better handling
-        df = pd.DataFrame(all_profiles)
-        
-        # Search filter
-        search = st.text_input("🔍 Search profiles", placeholder="Filter by username, profile name, or status...")
-        if search:
-            mask = df.apply(lambda row: row.astype(str).str.contains(search, case=False).any(), axis=1)
-            df = df[mask]
-            
-        # Display profiles table with checkboxes
-        if not df.empty:
-            selected_profiles = []
-            
-            # Create select all checkbox
-            select_all = st.checkbox("Select All")
-            
-            # Create a container for the table
-            table_container = st.container()
-            
-            with table_container:
-                for idx, row in df.iterrows():
-                    col1, col2, col3, col4, col5, col6, col7 = st.columns([0.5, 2, 2, 1.5, 2, 2, 2])
-                    
-                    with col1:
-                        selected = st.checkbox("", key=f"select_{idx}", value=select_all)
-                        if selected:
-                            selected_profiles.append({"username": row["username"], "profileName": row["profileName"]})
-                            
-                    with col2:
-                        st.write(row["username"])
-                    with col3:
-                        st.write(row["profileName"])
-                    with col4:
-                        status_color = STATUS_COLORS.get(row["status"].lower().replace(" ", ""), "#6B7280")
-                        st.markdown(
-                            f'<div style="background-color: {status_color}; padding: 5px 10px; '
-                            f'border-radius: 12px; color: black; font-size: 0.9em; display: inline-block;">'
-                            f'{row["status"]}</div>',
-                            unsafe_allow_html=True
-                        )
-                    with col5:
-                        st.write(row["lastConfiguredOn"])
-                    with col6:
-                        st.write(row["nextScheduledSyncOn"])
-                    with col7:
-                        st.write(row["lastDiscoveryCompletedOn"])
-                        
-            # Bulk delete button
-            if selected_profiles:
-                if st.button(f"Delete Selected ({len(selected_profiles)} profiles)", type="primary"):
-                    delete_success = []
-                    delete_failed = []
-                    
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    for i, profile in enumerate(selected_profiles):
-                        status_text.write(f"Deleting {profile['profileName']}...")
-                        success, error = delete_profile(
-                            st.session_state.tokens[profile["username"]],
-                            gateway_url,
-                            profile["profileName"]
-                        )
-                        
-                        if success:
-                            delete_success.append(profile["profileName"])
-                        else:
-                            delete_failed.append((profile["profileName"], error))
-                            
-                        progress_bar.progress((i + 1) / len(selected_profiles))
-                        
-                    if delete_success:
-                        st.success(f"Successfully deleted {len(delete_success)} profiles")
-                    if delete_failed:
-                        for profile, error in delete_failed:
-                            st.error(f"Failed to delete {profile}: {error}")
-                            
-                    time.sleep(2)
-                    st.rerun()
-            
-        # Auto-refresh
-        time.sleep(30)
-        st.session_state.update_counter += 1
-        st.rerun()
+        # Refreshes and table interactions rerun only this fragment,
+        # leaving the page config and sidebar untouched
+        render_profiles(gateway_url)
 
 if __name__ == "__main__":
     main()